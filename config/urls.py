@@ -9,6 +9,8 @@ urlpatterns = [
     path('', include('lmsapp.urls')),
 ]
 
+handler403 = 'lmsapp.views.permission_denied'
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,6 +1,9 @@
 # admin.py
+from datetime import timedelta
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from .models import (
     User, Role, Course, Level, Room, Shift,
@@ -22,8 +25,8 @@ class RoleAdmin(admin.ModelAdmin):
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    list_display = ['username', 'first_name', 'last_name', 'role', 'is_active', 'date_joined']
-    list_filter = ['role', 'is_active', 'date_joined']
+    list_display = ['username', 'first_name', 'last_name', 'role_name', 'is_active', 'date_joined']
+    list_filter = ['role_name', 'is_active', 'date_joined']
     search_fields = ['username', 'first_name', 'last_name', 'email']
     ordering = ['username']
 
@@ -35,9 +38,6 @@ class UserAdmin(BaseUserAdmin):
         ('Additional Info', {'fields': ('first_name', 'last_name', 'role')}),
     )
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('role')
-
 
 @admin.register(Level)
 class LevelAdmin(admin.ModelAdmin):
@@ -64,13 +64,10 @@ class ShiftAdmin(admin.ModelAdmin):
     ordering = ['start_time']
 
     def duration(self, obj):
-        from datetime import datetime, timedelta
-        start = datetime.combine(datetime.today(), obj.start_time)
-        end = datetime.combine(datetime.today(), obj.end_time)
-        duration = end - start
-        return str(duration)
+        return str(timedelta(seconds=obj.duration_seconds))
 
     duration.short_description = 'Duration'
+    duration.admin_order_field = 'duration_seconds'
 
 
 class StudentDetailInline(admin.TabularInline):
@@ -78,6 +75,11 @@ class StudentDetailInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['attendance_percentage', 'enrollment_date']
     fields = ['user', 'attendance_percentage', 'enrollment_date']
+    raw_id_fields = ['user']
+
+    def get_queryset(self, request):
+        # str(obj) labels each row with the course name
+        return super().get_queryset(request).select_related('user', 'course')
 
 
 @admin.register(Course)
@@ -90,14 +92,15 @@ class CourseAdmin(admin.ModelAdmin):
     search_fields = ['name', 'teacher__first_name', 'teacher__last_name']
     ordering = ['name']
     inlines = [StudentDetailInline]
+    list_per_page = 50
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'level', 'teacher', 'room', 'shift'
-        ).prefetch_related('studentdetail_set')
+        ).annotate(_student_count=Count('studentdetail'))
 
     def student_count(self, obj):
-        count = obj.studentdetail_set.count()
+        count = obj._student_count
         return format_html(
             '<span style="color: {};">{}</span>',
             'green' if count > 0 else 'red',
@@ -105,6 +108,7 @@ class CourseAdmin(admin.ModelAdmin):
         )
 
     student_count.short_description = 'Students'
+    student_count.admin_order_field = '_student_count'
 
 
 @admin.register(StudentDetail)
@@ -116,9 +120,7 @@ class StudentDetailAdmin(admin.ModelAdmin):
     list_filter = ['course', 'enrollment_date']
     search_fields = ['user__first_name', 'user__last_name', 'course__name']
     readonly_fields = ['attendance_percentage', 'enrollment_date']
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user', 'course')
+    list_select_related = ['user', 'course__level', 'course__shift']
 
     def attendance_status(self, obj):
         percentage = obj.attendance_percentage
@@ -145,6 +147,22 @@ class AttendanceInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['marked_at', 'marked_by']
     fields = ['student', 'status', 'marked_by', 'marked_at']
+    raw_id_fields = ['student']
+
+    def get_queryset(self, request):
+        # str(obj) labels each row with the lesson and its course
+        return super().get_queryset(request).select_related(
+            'student', 'marked_by', 'status', 'lesson__course'
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'status':
+            # One choice list shared by every row's <select> instead of a query per row
+            field.choices = [('', field.empty_label)] + [
+                (status.pk, str(status)) for status in AttendanceStatus.get_cached()
+            ]
+        return field
 
 
 @admin.register(Lesson)
@@ -154,13 +172,27 @@ class LessonAdmin(admin.ModelAdmin):
     search_fields = ['topic', 'course__name']
     ordering = ['-date']
     inlines = [AttendanceInline]
+    list_per_page = 50
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('course').prefetch_related('attendances')
+        # Separate subqueries keep the two counts from multiplying each other's joins
+        marked = Attendance.objects.filter(lesson=OuterRef('pk')).values('lesson').annotate(
+            count=Count('pk')
+        ).values('count')
+        enrolled = StudentDetail.objects.filter(course=OuterRef('course')).values('course').annotate(
+            count=Count('pk')
+        ).values('count')
+        return super().get_queryset(request).select_related(
+            'course__level', 'course__shift'
+        ).annotate(
+            _attendance_count=Coalesce(Subquery(marked, output_field=IntegerField()), 0),
+            _student_count=Coalesce(Subquery(enrolled, output_field=IntegerField()), 0),
+        )
 
     def attendance_count(self, obj):
-        count = obj.attendances.count()
-        total_students = obj.course.studentdetail_set.count()
+        count = obj._attendance_count
+        total_students = obj._student_count
 
         if total_students == 0:
             return format_html('<span style="color: gray;">No students</span>')
@@ -185,11 +217,15 @@ class AttendanceStatusAdmin(admin.ModelAdmin):
 
     get_display_name.short_description = 'Display Name'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_usage_count=Count('attendance'))
+
     def usage_count(self, obj):
-        count = obj.attendance_set.count()
+        count = obj._usage_count
         return format_html('<span style="font-weight: bold;">{}</span>', count)
 
     usage_count.short_description = 'Times Used'
+    usage_count.admin_order_field = '_usage_count'
 
 
 @admin.register(Attendance)
@@ -204,11 +240,9 @@ class AttendanceAdmin(admin.ModelAdmin):
     ]
     ordering = ['-marked_at']
     date_hierarchy = 'marked_at'
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'student', 'lesson', 'lesson__course', 'status', 'marked_by'
-        )
+    list_per_page = 50
+    show_full_result_count = False
+    list_select_related = ['student', 'lesson__course', 'status', 'marked_by']
 
 
 # Customize admin site header
@@ -5,4 +5,5 @@ class LmsappConfig(AppConfig):
     name = 'lmsapp'
 
     def ready(self):
-        import lmsapp.templatetags.custom_filters
\ No newline at end of file
+        import lmsapp.templatetags.custom_filters
+        import lmsapp.signals
\ No newline at end of file
@@ -0,0 +1,62 @@
+# caching.py
+from django.core.cache import cache
+from django.db.models import Q, Count
+from .models import User, Course, LOOKUP_CACHE_TIMEOUT
+
+DASHBOARD_COUNTS_KEY = 'dash:counts:{}'
+DASHBOARD_COUNTS_TIMEOUT = 60
+# Which user roles each dashboard shows totals for
+DASHBOARD_COUNTED_ROLES = {
+    'superadmin': ['admin', 'teacher', 'student'],
+    'admin': ['teacher', 'student'],
+}
+
+LOOKUP_CHOICES_KEY = 'lookup:choices:{}'
+ENROLL_COURSE_CHOICES_KEY = 'enrollform:courses'
+
+
+def lookup_choices(model):
+    """Select choices for a small lookup table, cached until one of its rows changes"""
+    return cache.get_or_set(
+        LOOKUP_CHOICES_KEY.format(model._meta.model_name),
+        lambda: [(obj.pk, str(obj)) for obj in model.objects.all()],
+        LOOKUP_CACHE_TIMEOUT
+    )
+
+
+def clear_lookup_choices(model):
+    cache.delete(LOOKUP_CHOICES_KEY.format(model._meta.model_name))
+
+
+def enroll_course_choices():
+    """Active course choices for enrollment; labels need the level and shift too"""
+    return cache.get_or_set(
+        ENROLL_COURSE_CHOICES_KEY,
+        lambda: [
+            (course.pk, str(course))
+            for course in Course.objects.filter(is_active=True).select_related('level', 'shift')
+        ],
+        LOOKUP_CACHE_TIMEOUT
+    )
+
+
+def clear_enroll_course_choices():
+    cache.delete(ENROLL_COURSE_CHOICES_KEY)
+
+
+def dashboard_counts(role):
+    """Dashboard totals for a role, cached briefly since they change rarely"""
+    key = DASHBOARD_COUNTS_KEY.format(role)
+    counts = cache.get(key)
+    if counts is None:
+        counts = User.objects.aggregate(**{
+            f'total_{name}s': Count('id', filter=Q(role_name=name))
+            for name in DASHBOARD_COUNTED_ROLES[role]
+        })
+        counts['total_courses'] = Course.objects.filter(is_active=True).count()
+        cache.set(key, counts, DASHBOARD_COUNTS_TIMEOUT)
+    return counts
+
+
+def clear_dashboard_counts():
+    cache.delete_many([DASHBOARD_COUNTS_KEY.format(role) for role in DASHBOARD_COUNTED_ROLES])
@@ -1,6 +1,6 @@
 # decorators.py
 from functools import wraps
-from django.contrib import messages
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.core.exceptions import PermissionDenied
 
@@ -9,18 +9,34 @@ def role_required(allowed_roles):
     """
     Decorator to check if user has required role
     Usage: @role_required(['admin', 'superadmin'])
+    Works on both sync and async views
     """
 
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                # Hand the loaded user to the sync side too, so templates don't fetch it again
+                request.user = user
+                if not user.is_authenticated:
+                    return redirect('login')
+
+                if user.role_name not in allowed_roles:
+                    raise PermissionDenied('You do not have permission to access this page.')
+
+                return await view_func(request, *args, **kwargs)
+
+            return async_wrapper
+
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
             if not request.user.is_authenticated:
                 return redirect('login')
 
-            user_role = request.user.role.name
+            user_role = request.user.role_name
             if user_role not in allowed_roles:
-                messages.error(request, 'You do not have permission to access this page.')
-                return redirect('dashboard')
+                raise PermissionDenied('You do not have permission to access this page.')
 
             return view_func(request, *args, **kwargs)
 
@@ -38,8 +54,7 @@ def superadmin_required(view_func):
             return redirect('login')
 
         if not request.user.is_superadmin():
-            messages.error(request, 'Superadmin access required.')
-            return redirect('dashboard')
+            raise PermissionDenied('Superadmin access required.')
 
         return view_func(request, *args, **kwargs)
 
@@ -55,8 +70,7 @@ def admin_required(view_func):
             return redirect('login')
 
         if not request.user.is_admin():
-            messages.error(request, 'Admin access required.')
-            return redirect('dashboard')
+            raise PermissionDenied('Admin access required.')
 
         return view_func(request, *args, **kwargs)
 
@@ -72,8 +86,7 @@ def teacher_required(view_func):
             return redirect('login')
 
         if not request.user.is_teacher():
-            messages.error(request, 'Teacher access required.')
-            return redirect('dashboard')
+            raise PermissionDenied('Teacher access required.')
 
         return view_func(request, *args, **kwargs)
 
@@ -89,9 +102,27 @@ def student_required(view_func):
             return redirect('login')
 
         if not request.user.is_student():
-            messages.error(request, 'Student access required.')
-            return redirect('dashboard')
+            raise PermissionDenied('Student access required.')
 
         return view_func(request, *args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def redirect_if_authenticated(redirect_to):
+    """
+    Decorator sending signed-in users straight on, for pages like login
+    Usage: @redirect_if_authenticated('dashboard')
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return redirect(redirect_to)
+
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,8 +1,11 @@
 # forms.py
+import json
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
-from .models import User, Role, Course, Level, Room, Shift, Lesson, StudentDetail
+from django.db import IntegrityError, transaction
+from .models import User, Role, Course, Level, Room, Shift, Lesson, StudentDetail, AttendanceStatus
+from .caching import lookup_choices, enroll_course_choices
 
 
 class LoginForm(forms.Form):
@@ -58,22 +61,26 @@ class UserForm(forms.ModelForm):
             raise ValidationError("Passwords don't match")
         return password2
 
-    def clean_username(self):
-        username = self.cleaned_data.get('username')
-        if User.objects.filter(username=username).exists():
-            raise ValidationError("Username already exists")
-        return username
+    def validate_unique(self):
+        # Username is the only unique field here; the database index enforces it in save()
+        pass
 
     def save(self, commit=True):
         user = super().save(commit=False)
         user.set_password(self.cleaned_data['password1'])
 
         if self.role_name:
-            role = Role.objects.get(name=self.role_name)
+            role = Role.get_cached(self.role_name)
             user.role = role
 
         if commit:
-            user.save()
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError:
+                if User.objects.filter(username=user.username).exists():
+                    raise ValidationError({'username': "Username already exists"})
+                raise
         return user
 
 
@@ -92,7 +99,11 @@ class CourseForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Filter teachers only
-        self.fields['teacher'].queryset = User.objects.filter(role__name='teacher', is_active=True)
+        self.fields['teacher'].queryset = User.objects.filter(role_name='teacher', is_active=True)
+        # Render the lookup selects from cache; the querysets still validate POSTs
+        for name, model in (('level', Level), ('room', Room), ('shift', Shift)):
+            field = self.fields[name]
+            field.choices = [('', field.empty_label)] + lookup_choices(model)
 
     def clean(self):
         cleaned_data = super().clean()
@@ -100,11 +111,11 @@ class CourseForm(forms.ModelForm):
         shift = cleaned_data.get('shift')
 
         if room and shift:
-            # Check if room-shift combination is already taken
+            # Check if room-shift combination is already taken. Inactive courses
+            # still hold the (room, shift) unique index, so they count too.
             existing_course = Course.objects.filter(
-                room=room,
-                shift=shift,
-                is_active=True
+                room_id=room.pk,
+                shift_id=shift.pk
             )
 
             # Exclude current instance if editing
@@ -134,36 +145,44 @@ class LessonForm(forms.ModelForm):
             }),
         }
 
-    def clean_date(self):
-        date = self.cleaned_data.get('date')
-        if date and hasattr(self, 'course'):
-            # Check if lesson already exists for this course on this date
-            if Lesson.objects.filter(course=self.course, date=date).exists():
-                raise ValidationError(
-                    f"A lesson already exists for this course on {date}"
-                )
-        return date
+
+def _parse_id(value):
+    """Primary key from a JSON int or digit string; rejects bools, floats and the like"""
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"Invalid id: {value!r}")
 
 
 class AttendanceForm(forms.Form):
+    """Whole attendance sheet submitted as one JSON object: {student_id: status_id}"""
+    payload = forms.CharField(widget=forms.HiddenInput)
+
     def __init__(self, *args, **kwargs):
         students = kwargs.pop('students', [])
         super().__init__(*args, **kwargs)
+        self.student_ids = {student.id for student in students}
 
-        from .models import AttendanceStatus
-        status_choices = [(s.id, s.get_name_display()) for s in AttendanceStatus.objects.all()]
+    def clean_payload(self):
+        try:
+            data = json.loads(self.cleaned_data['payload'])
+            sheet = {_parse_id(student_id): _parse_id(status_id) for student_id, status_id in data.items()}
+        except (ValueError, TypeError, AttributeError):
+            raise ValidationError("Invalid attendance data")
 
-        for student in students:
-            self.fields[f'student_{student.id}'] = forms.ChoiceField(
-                choices=[('', '-- Select Status --')] + status_choices,
-                required=True,
-                widget=forms.Select(attrs={'class': 'form-control'})
-            )
+        valid_status_ids = {status.id for status in AttendanceStatus.get_cached()}
+        if not valid_status_ids.issuperset(sheet.values()):
+            raise ValidationError("Unknown attendance status")
+        if not self.student_ids.issuperset(sheet):
+            raise ValidationError("Student is not enrolled in this course")
+
+        return sheet
 
 
 class StudentEnrollmentForm(forms.Form):
     student = forms.ModelChoiceField(
-        queryset=User.objects.filter(role__name='student', is_active=True),
+        queryset=User.objects.filter(role_name='student', is_active=True),
         widget=forms.Select(attrs={'class': 'form-control'}),
         empty_label="-- Select Student --"
     )
@@ -173,20 +192,27 @@ class StudentEnrollmentForm(forms.Form):
         required=True
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Render the checkboxes from cache; the queryset still validates POSTs
+        self.fields['courses'].choices = enroll_course_choices()
+
     def clean(self):
         cleaned_data = super().clean()
         student = cleaned_data.get('student')
         courses = cleaned_data.get('courses')
 
         if student and courses:
-            # Check for existing enrollments
-            existing_enrollments = StudentDetail.objects.filter(
-                user=student,
-                course__in=courses
-            ).values_list('course__name', flat=True)
-
-            if existing_enrollments:
-                course_names = ', '.join(existing_enrollments)
+            # Check for existing enrollments; names come from the courses already loaded
+            existing_ids = set(StudentDetail.objects.filter(
+                user_id=student.pk,
+                course_id__in=[course.pk for course in courses]
+            ).values_list('course_id', flat=True))
+
+            if existing_ids:
+                course_names = ', '.join(
+                    course.name for course in courses if course.pk in existing_ids
+                )
                 raise ValidationError(
                     f"Student is already enrolled in: {course_names}"
                 )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-15 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('lmsapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='role',
+            name='name',
+            field=models.CharField(choices=[('superadmin', 'Superadmin'), ('admin', 'Admin'), ('teacher', 'Teacher'), ('student', 'Student')], max_length=20, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-marked_at'], name='lmsapp_atte_marked__d324dc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['status', 'marked_at'], name='lmsapp_atte_status__275f0c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['-date', 'course'], name='lmsapp_less_date_810618_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentdetail',
+            index=models.Index(fields=['course', 'user'], name='lmsapp_stud_course__1b6853_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'is_active'], name='lmsapp_user_role_id_fecdba_idx'),
+        ),
+    ]
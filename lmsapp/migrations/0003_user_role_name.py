@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-15 03:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_role_names(apps, schema_editor):
+    User = apps.get_model('lmsapp', 'User')
+    Role = apps.get_model('lmsapp', 'Role')
+    for role in Role.objects.all():
+        User.objects.filter(role=role).update(role_name=role.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lmsapp', '0002_add_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role_name',
+            field=models.CharField(choices=[('superadmin', 'Superadmin'), ('admin', 'Admin'), ('teacher', 'Teacher'), ('student', 'Student')], db_index=True, default='', editable=False, max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_role_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='attendance',
+            name='marked_by',
+            field=models.ForeignKey(limit_choices_to={'role_name': 'teacher'}, on_delete=django.db.models.deletion.PROTECT, related_name='marked_attendances', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='attendance',
+            name='student',
+            field=models.ForeignKey(limit_choices_to={'role_name': 'student'}, on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='teacher',
+            field=models.ForeignKey(limit_choices_to={'role_name': 'teacher'}, on_delete=django.db.models.deletion.PROTECT, related_name='teaching_courses', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='studentdetail',
+            name='user',
+            field=models.ForeignKey(limit_choices_to={'role_name': 'student'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
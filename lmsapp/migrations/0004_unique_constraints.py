@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-15 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lmsapp', '0003_user_role_name'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='attendance',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='course',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='lesson',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentdetail',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'lesson'], name='lmsapp_atte_student_af8039_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['lesson', 'status'], name='lmsapp_atte_lesson__eac442_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('lesson', 'student'), name='uniq_att_lesson_student'),
+        ),
+        migrations.AddConstraint(
+            model_name='course',
+            constraint=models.UniqueConstraint(fields=('room', 'shift'), name='uniq_course_room_shift'),
+        ),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.UniqueConstraint(fields=('course', 'date'), name='uniq_lesson_course_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentdetail',
+            constraint=models.UniqueConstraint(fields=('user', 'course'), name='uniq_enrollment_user_course'),
+        ),
+    ]
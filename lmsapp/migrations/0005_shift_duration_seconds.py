@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-15 03:52
+
+from datetime import date, datetime
+
+from django.db import migrations, models
+
+
+def backfill_duration(apps, schema_editor):
+    Shift = apps.get_model('lmsapp', 'Shift')
+    for shift in Shift.objects.all():
+        start = datetime.combine(date.min, shift.start_time)
+        end = datetime.combine(date.min, shift.end_time)
+        shift.duration_seconds = int((end - start).total_seconds()) % 86400
+        shift.save(update_fields=['duration_seconds'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lmsapp', '0004_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shift',
+            name='duration_seconds',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_duration, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-15 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('lmsapp', '0005_shift_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='lmsapp_user_role_id_fecdba_idx',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role_name',
+            field=models.CharField(choices=[('superadmin', 'Superadmin'), ('admin', 'Admin'), ('teacher', 'Teacher'), ('student', 'Student')], editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['teacher', 'is_active'], name='lmsapp_cour_teacher_f3053a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role_name', 'is_active'], name='lmsapp_user_role_na_f9f06a_idx'),
+        ),
+    ]
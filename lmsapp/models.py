@@ -1,9 +1,18 @@
 # models.py
+from datetime import date, datetime
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Count, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
+# Small lookup tables are cached across workers and re-read at least this often (seconds)
+LOOKUP_CACHE_TIMEOUT = 300
+ROLE_TABLE_KEY = 'lookup:roles'
+STATUS_TABLE_KEY = 'lookup:statuses'
+
 
 class Role(models.Model):
     ROLE_CHOICES = [
@@ -18,33 +27,74 @@ class Role(models.Model):
     def __str__(self):
         return self.get_name_display()
 
+    @classmethod
+    def get_cached(cls, name):
+        """Get a role by name from the shared role cache"""
+        role = _role_table().get(name)
+        if role is not None:
+            return role
+        # Possibly created by another process; fall back to the database
+        role = cls.objects.get(name=name)
+        cls.clear_cache()
+        return role
+
+    @classmethod
+    def clear_cache(cls):
+        cache.delete(ROLE_TABLE_KEY)
+
+
+def _role_table():
+    """All roles keyed by name; the table holds a handful of fixed rows"""
+    return cache.get_or_set(
+        ROLE_TABLE_KEY,
+        lambda: {role.name: role for role in Role.objects.all()},
+        LOOKUP_CACHE_TIMEOUT
+    )
+
 
 class User(AbstractUser):
     first_name = models.CharField(max_length=30)
     last_name = models.CharField(max_length=30)
     role = models.ForeignKey(Role, on_delete=models.PROTECT)
+    # Denormalized copy of role.name, kept in sync by save()
+    role_name = models.CharField(max_length=20, choices=Role.ROLE_CHOICES, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role_name', 'is_active']),  # Role-filtered user lists/choices
+        ]
+
     def __str__(self):
-        return f"{self.first_name} {self.last_name} ({self.role.name})"
+        return f"{self.first_name} {self.last_name} ({self.role_name})"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'role' in update_fields:
+            if self.role_id is not None:
+                self.role_name = self.role.name
+            if update_fields is not None:
+                # A partial save of the role must write its name as well
+                kwargs['update_fields'] = {*update_fields, 'role_name'}
+        super().save(*args, **kwargs)
 
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
     def is_superadmin(self):
-        return self.role.name == 'superadmin'
+        return self.role_name == 'superadmin'
 
     def is_admin(self):
-        return self.role.name == 'admin'
+        return self.role_name == 'admin'
 
     def is_teacher(self):
-        return self.role.name == 'teacher'
+        return self.role_name == 'teacher'
 
     def is_student(self):
-        return self.role.name == 'student'
+        return self.role_name == 'student'
 
 
 class Level(models.Model):
@@ -74,10 +124,18 @@ class Shift(models.Model):
     name = models.CharField(max_length=50)  # e.g., "Morning 9:00-11:00"
     start_time = models.TimeField()
     end_time = models.TimeField()
+    duration_seconds = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        start = datetime.combine(date.min, self.start_time)
+        end = datetime.combine(date.min, self.end_time)
+        # Modulo a day so shifts that run past midnight stay positive
+        self.duration_seconds = int((end - start).total_seconds()) % 86400
+        super().save(*args, **kwargs)
+
 
 class Course(models.Model):
     name = models.CharField(max_length=100)
@@ -87,7 +145,7 @@ class Course(models.Model):
     teacher = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
-        limit_choices_to={'role__name': 'teacher'},
+        limit_choices_to={'role_name': 'teacher'},
         related_name='teaching_courses'
     )
     created_at = models.DateTimeField(auto_now_add=True)
@@ -95,7 +153,13 @@ class Course(models.Model):
     is_active = models.BooleanField(default=True)
 
     class Meta:
-        unique_together = ['room', 'shift']  # One course per room per shift
+        constraints = [
+            # One course per room per shift
+            models.UniqueConstraint(fields=['room', 'shift'], name='uniq_course_room_shift'),
+        ]
+        indexes = [
+            models.Index(fields=['teacher', 'is_active']),  # A teacher's active courses
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.level} ({self.shift})"
@@ -105,7 +169,7 @@ class StudentDetail(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        limit_choices_to={'role__name': 'student'}
+        limit_choices_to={'role_name': 'student'}
     )
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     enrollment_date = models.DateTimeField(auto_now_add=True)
@@ -115,7 +179,13 @@ class StudentDetail(models.Model):
     )
 
     class Meta:
-        unique_together = ['user', 'course']  # Student can enroll in course only once
+        constraints = [
+            # Student can enroll in course only once
+            models.UniqueConstraint(fields=['user', 'course'], name='uniq_enrollment_user_course'),
+        ]
+        indexes = [
+            models.Index(fields=['course', 'user']),  # Per-course enrollment lookups/counts
+        ]
 
     def __str__(self):
         return f"{self.user.full_name} - {self.course.name}"
@@ -126,10 +196,33 @@ class StudentDetail(models.Model):
         if total_lessons == 0:
             self.attendance_percentage = 0.0
         else:
-            present_count = self.attendances.filter(status__name='present').count()
+            present_count = Attendance.objects.filter(
+                student_id=self.user_id,
+                lesson__course_id=self.course_id,
+                status__name='present'
+            ).count()
             self.attendance_percentage = (present_count / total_lessons) * 100
         self.save()
 
+    @classmethod
+    def recompute_percentages_for_course(cls, course_id):
+        """Recalculate attendance percentage for every student in a course in one UPDATE"""
+        enrollments = cls.objects.filter(course_id=course_id)
+        total_lessons = Lesson.objects.filter(course_id=course_id).count()
+        if total_lessons == 0:
+            enrollments.update(attendance_percentage=0.0)
+            return
+
+        present_count = Attendance.objects.filter(
+            student=OuterRef('user'),
+            lesson__course_id=course_id,
+            status__name='present'
+        ).values('student').annotate(count=Count('pk')).values('count')
+
+        enrollments.update(attendance_percentage=(
+            Cast(Coalesce(Subquery(present_count), 0), FloatField()) * 100.0 / total_lessons
+        ))
+
 
 class Lesson(models.Model):
     topic = models.CharField(max_length=200)
@@ -138,8 +231,14 @@ class Lesson(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ['course', 'date']  # One lesson per course per day
+        constraints = [
+            # One lesson per course per day
+            models.UniqueConstraint(fields=['course', 'date'], name='uniq_lesson_course_date'),
+        ]
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['-date', 'course']),  # Default ordering across courses
+        ]
 
     def __str__(self):
         return f"{self.course.name} - {self.topic} ({self.date})"
@@ -157,13 +256,22 @@ class AttendanceStatus(models.Model):
     def __str__(self):
         return self.get_name_display()
 
+    @classmethod
+    def get_cached(cls):
+        """All statuses from the shared status cache"""
+        return cache.get_or_set(STATUS_TABLE_KEY, lambda: tuple(cls.objects.all()), LOOKUP_CACHE_TIMEOUT)
+
+    @classmethod
+    def clear_cache(cls):
+        cache.delete(STATUS_TABLE_KEY)
+
 
 class Attendance(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='attendances')
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        limit_choices_to={'role__name': 'student'},
+        limit_choices_to={'role_name': 'student'},
         related_name='attendances'
     )
     status = models.ForeignKey(AttendanceStatus, on_delete=models.PROTECT)
@@ -171,16 +279,45 @@ class Attendance(models.Model):
     marked_by = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
-        limit_choices_to={'role__name': 'teacher'},
+        limit_choices_to={'role_name': 'teacher'},
         related_name='marked_attendances'
     )
 
     class Meta:
-        unique_together = ['lesson', 'student']  # One attendance record per student per lesson
+        constraints = [
+            # One attendance record per student per lesson
+            models.UniqueConstraint(fields=['lesson', 'student'], name='uniq_att_lesson_student'),
+        ]
+        indexes = [
+            models.Index(fields=['-marked_at']),  # Admin ordering and date hierarchy
+            models.Index(fields=['status', 'marked_at']),  # Admin status filter
+            models.Index(fields=['student', 'lesson']),  # A student's attendance across lessons
+            models.Index(fields=['lesson', 'status']),  # Per-lesson status breakdowns
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.lesson} - {self.status}"
 
+    @classmethod
+    def bulk_upsert(cls, lesson, statuses, marked_by):
+        """
+        Insert or update attendance for a lesson in a single statement
+        statuses: {student_id: status_id}
+        """
+        if not statuses:
+            return
+        cls.objects.bulk_create(
+            [
+                cls(lesson=lesson, student_id=student_id, status_id=status_id, marked_by=marked_by)
+                for student_id, status_id in statuses.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['lesson', 'student'],
+            update_fields=['status', 'marked_by', 'marked_at'],
+            batch_size=500,
+        )
+        StudentDetail.recompute_percentages_for_course(lesson.course_id)
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         # Update student's attendance percentage after marking attendance
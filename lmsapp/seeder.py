@@ -3,12 +3,12 @@ from lmsapp.models import User, Role
 
 def seed_data():
     # Check if 'superadmin' role exists, create if it doesn't
-    if not Role.objects.filter(name='superadmin').exists():
+    try:
+        superadmin_role = Role.get_cached('superadmin')
+    except Role.DoesNotExist:
         superadmin_role = Role(name='superadmin')
         superadmin_role.save()
         print("Superadmin role created.")
-    else:
-        superadmin_role = Role.objects.get(name='superadmin')
 
     # Check if a superuser already exists
     if not User.objects.filter(is_superuser=True).exists():
@@ -0,0 +1,52 @@
+# signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User, Role, Course, Level, Room, Shift, AttendanceStatus
+from .caching import clear_lookup_choices, clear_enroll_course_choices, clear_dashboard_counts
+
+
+@receiver([post_save, post_delete], sender=AttendanceStatus)
+def clear_status_cache(sender, **kwargs):
+    """Drop cached statuses whenever the lookup table changes"""
+    AttendanceStatus.clear_cache()
+
+
+@receiver([post_save, post_delete], sender=Level)
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Shift)
+def clear_lookup_cache(sender, **kwargs):
+    """Drop a lookup table's cached select choices whenever it changes"""
+    clear_lookup_choices(sender)
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Level)
+@receiver([post_save, post_delete], sender=Shift)
+def clear_enroll_course_cache(sender, **kwargs):
+    """Enrollment course labels include the level and shift names"""
+    clear_enroll_course_choices()
+
+
+@receiver([post_save, post_delete], sender=Role)
+def clear_role_cache(sender, **kwargs):
+    """Drop cached roles whenever the lookup table changes"""
+    Role.clear_cache()
+
+
+@receiver(post_save, sender=Role)
+def sync_role_name_on_users(sender, instance, **kwargs):
+    """Carry a renamed role over to the users' denormalized role_name"""
+    User.objects.filter(role=instance).exclude(role_name=instance.name).update(role_name=instance.name)
+
+
+@receiver([post_save, post_delete], sender=User)
+def clear_dashboard_user_counts(sender, update_fields=None, **kwargs):
+    """Per-role totals only move when users are added, removed or change role"""
+    if update_fields is not None and 'role' not in update_fields:
+        return
+    clear_dashboard_counts()
+
+
+@receiver([post_save, post_delete], sender=Course)
+def clear_dashboard_course_counts(sender, **kwargs):
+    clear_dashboard_counts()
@@ -1,3 +1,96 @@
+import datetime
+import json
 from django.test import TestCase
+from .forms import AttendanceForm
+from .models import (
+    User, Role, Level, Room, Shift, Course, StudentDetail, Lesson, AttendanceStatus, Attendance
+)
 
-# Create your tests here.
+
+class UserRoleNameTests(TestCase):
+    def setUp(self):
+        self.student_role = Role.objects.create(name='student')
+        self.teacher_role = Role.objects.create(name='teacher')
+        self.user = User.objects.create(username='jdoe', role=self.student_role)
+
+    def test_role_name_set_on_create(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role_name, 'student')
+
+    def test_partial_save_of_role_writes_role_name(self):
+        self.user.role = self.teacher_role
+        self.user.save(update_fields=['role'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role_name, 'teacher')
+        self.assertTrue(self.user.is_teacher())
+
+    def test_role_rename_carries_over_to_users(self):
+        self.student_role.name = 'admin'
+        self.student_role.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.role_name, 'admin')
+
+
+class AttendanceFormTests(TestCase):
+    def setUp(self):
+        role = Role.objects.create(name='student')
+        self.student = User.objects.create(username='jdoe', role=role)
+        self.present = AttendanceStatus.objects.create(name='present')
+
+    def form(self, sheet):
+        return AttendanceForm({'payload': json.dumps(sheet)}, students=[self.student])
+
+    def test_valid_sheet(self):
+        form = self.form({str(self.student.id): str(self.present.id)})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['payload'], {self.student.id: self.present.id})
+
+    def test_rejects_non_integer_status(self):
+        for status_id in (True, 1.9, '1.0', None):
+            self.assertFalse(self.form({str(self.student.id): status_id}).is_valid(), status_id)
+
+    def test_rejects_unknown_status_and_student(self):
+        self.assertFalse(self.form({str(self.student.id): self.present.id + 1}).is_valid())
+        self.assertFalse(self.form({str(self.student.id + 1): self.present.id}).is_valid())
+
+
+class RecomputePercentagesTests(TestCase):
+    def setUp(self):
+        student_role = Role.objects.create(name='student')
+        self.teacher = User.objects.create(username='teacher', role=Role.objects.create(name='teacher'))
+        self.course = Course.objects.create(
+            name='English',
+            level=Level.objects.create(level='beginner'),
+            room=Room.objects.create(number='101'),
+            shift=Shift.objects.create(name='Morning', start_time=datetime.time(9), end_time=datetime.time(11)),
+            teacher=self.teacher
+        )
+        self.students = [User.objects.create(username=f'student{i}', role=student_role) for i in range(3)]
+        for student in self.students:
+            StudentDetail.objects.create(user=student, course=self.course)
+        self.present = AttendanceStatus.objects.create(name='present')
+        self.absent = AttendanceStatus.objects.create(name='absent')
+
+    def percentages(self):
+        return {
+            detail.user_id: detail.attendance_percentage
+            for detail in StudentDetail.objects.filter(course=self.course)
+        }
+
+    def test_mixed_present_and_absent(self):
+        lessons = [
+            Lesson.objects.create(course=self.course, topic=f'Lesson {i}', date=datetime.date(2025, 1, i + 1))
+            for i in range(4)
+        ]
+        first, second, third = self.students
+        for lesson in lessons[:3]:
+            Attendance.bulk_upsert(lesson, {first.id: self.present.id, second.id: self.absent.id}, self.teacher)
+        Attendance.bulk_upsert(lessons[3], {second.id: self.present.id}, self.teacher)
+
+        StudentDetail.recompute_percentages_for_course(self.course.id)
+        self.assertEqual(self.percentages(), {first.id: 75.0, second.id: 25.0, third.id: 0.0})
+
+    def test_course_without_lessons(self):
+        StudentDetail.objects.filter(course=self.course).update(attendance_percentage=50.0)
+        StudentDetail.recompute_percentages_for_course(self.course.id)
+        self.assertEqual(set(self.percentages().values()), {0.0})
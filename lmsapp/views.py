@@ -1,12 +1,15 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
+from django.views import defaults
 from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Q, Count, Avg
+from django.db.models import Count
 from .models import (
     User, Role, Course, Level, Room, Shift,
     StudentDetail, Lesson, Attendance, AttendanceStatus
@@ -15,17 +18,32 @@ from .forms import (
     LoginForm, UserForm, CourseForm, LessonForm,
     AttendanceForm, StudentEnrollmentForm
 )
-from .decorators import role_required
+from .decorators import role_required, redirect_if_authenticated
+from .caching import dashboard_counts
+from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns the user list templates render, fetched as plain dicts
+USER_LIST_FIELDS = ['id', 'first_name', 'last_name', 'username', 'email', 'is_active']
+LIST_PAGE_SIZE = 50
 
+# Template rendering touches the session and lazy request.user, so async views render in a thread
+arender = sync_to_async(render)
+
+
+async def apaginate(request, queryset):
+    """Return the requested page of a queryset, with its rows loaded, from an async view"""
+    paginator = Paginator(queryset, LIST_PAGE_SIZE)
+    page = await sync_to_async(paginator.get_page)(request.GET.get('page'))
+    page.object_list = [obj async for obj in page.object_list]
+    return page
+
+
+@redirect_if_authenticated('dashboard')
 def login_view(request):
     """Handle user login"""
-    if request.user.is_authenticated:
-        return redirect('dashboard')
-
     if request.method == 'POST':
         form = LoginForm(request.POST)
         if form.is_valid():
@@ -35,7 +53,7 @@ def login_view(request):
             user = authenticate(request, username=username, password=password)
             if user and user.is_active:
                 login(request, user)
-                logger.info(f"User {username} logged in successfully")
+                logger.info("User %s logged in successfully", username)
                 return redirect('dashboard')
             else:
                 messages.error(request, 'Invalid credentials or inactive account')
@@ -45,63 +63,89 @@ def login_view(request):
     return render(request, 'auth/login.html', {'form': form})
 
 
+def permission_denied(request, exception=None):
+    """403 handler: flash the reason and go to the dashboard, but only for browser requests"""
+    if request.user.is_authenticated and request.accepts('text/html'):
+        messages.error(request, str(exception or '') or 'You do not have permission to access this page.')
+        return redirect('dashboard')
+    return defaults.permission_denied(request, exception)
+
+
 @login_required
 def logout_view(request):
     """Handle user logout"""
     username = request.user.username
     logout(request)
-    logger.info(f"User {username} logged out")
+    logger.info("User %s logged out", username)
     messages.success(request, 'You have been logged out successfully')
     return redirect('login')
 
 
+def superadmin_dashboard(request, context):
+    """Superadmin dashboard"""
+    context.update(dashboard_counts('superadmin'))
+    context.update({
+        'recent_activities': [],  # Can be implemented later
+    })
+    return render(request, 'dashboard/superadmin.html', context)
+
+
+def admin_dashboard(request, context):
+    """Admin dashboard"""
+    context.update(dashboard_counts('admin'))
+    context.update({
+        'active_courses': Course.objects.filter(is_active=True)[:5],
+    })
+    return render(request, 'dashboard/admin.html', context)
+
+
+def teacher_dashboard(request, context):
+    """Teacher dashboard"""
+    # Enrollment counts ride along with the course rows instead of a separate COUNT
+    assigned_courses = list(Course.objects.filter(teacher=request.user, is_active=True).annotate(
+        student_count=Count('studentdetail')
+    ))
+    context.update({
+        'assigned_courses': assigned_courses,
+        'total_students': sum(course.student_count for course in assigned_courses),
+        'recent_lessons': Lesson.objects.filter(
+            course_id__in=[course.id for course in assigned_courses]
+        ).only('topic', 'date')[:5],
+    })
+    return render(request, 'dashboard/teacher.html', context)
+
+
+def student_dashboard(request, context):
+    """Student dashboard"""
+    # The page lists every enrollment anyway, so average the loaded rows
+    enrolled_courses = list(
+        StudentDetail.objects.filter(user=request.user).select_related('course')
+    )
+    percentages = [enrollment.attendance_percentage for enrollment in enrolled_courses]
+    context.update({
+        'enrolled_courses': enrolled_courses,
+        'attendance_avg': sum(percentages) / len(percentages) if percentages else 0,
+    })
+    return render(request, 'dashboard/student.html', context)
+
+
+ROLE_DASHBOARDS = {
+    'superadmin': superadmin_dashboard,
+    'admin': admin_dashboard,
+    'teacher': teacher_dashboard,
+    'student': student_dashboard,
+}
+
+
 @login_required
 def dashboard(request):
     """Main dashboard view - role-based content"""
-    user = request.user
-    context = {'user': user}
-
-    if user.is_superadmin():
-        # Superadmin dashboard
-        context.update({
-            'total_admins': User.objects.filter(role__name='admin').count(),
-            'total_teachers': User.objects.filter(role__name='teacher').count(),
-            'total_students': User.objects.filter(role__name='student').count(),
-            'total_courses': Course.objects.filter(is_active=True).count(),
-            'recent_activities': [],  # Can be implemented later
-        })
-        return render(request, 'dashboard/superadmin.html', context)
-
-    elif user.is_admin():
-        # Admin dashboard
-        context.update({
-            'total_teachers': User.objects.filter(role__name='teacher').count(),
-            'total_students': User.objects.filter(role__name='student').count(),
-            'total_courses': Course.objects.filter(is_active=True).count(),
-            'active_courses': Course.objects.filter(is_active=True)[:5],
-        })
-        return render(request, 'dashboard/admin.html', context)
-
-    elif user.is_teacher():
-        # Teacher dashboard
-        assigned_courses = Course.objects.filter(teacher=user, is_active=True)
-        context.update({
-            'assigned_courses': assigned_courses,
-            'total_students': StudentDetail.objects.filter(course__in=assigned_courses).count(),
-            'recent_lessons': Lesson.objects.filter(course__in=assigned_courses)[:5],
-        })
-        return render(request, 'dashboard/teacher.html', context)
-
-    elif user.is_student():
-        # Student dashboard
-        enrolled_courses = StudentDetail.objects.filter(user=user)
-        context.update({
-            'enrolled_courses': enrolled_courses,
-            'attendance_avg': enrolled_courses.aggregate(
-                avg=Avg('attendance_percentage')
-            )['avg'] or 0,
-        })
-        return render(request, 'dashboard/student.html', context)
+    context = {'user': request.user}
+
+    # Dispatch on the stored role name once rather than probing each is_*() in turn
+    role_dashboard = ROLE_DASHBOARDS.get(request.user.role_name)
+    if role_dashboard:
+        return role_dashboard(request, context)
 
     return render(request, 'dashboard/default.html', context)
 
@@ -109,10 +153,12 @@ def dashboard(request):
 # User Management Views
 @login_required
 @role_required(['superadmin'])
-def admin_list(request):
+async def admin_list(request):
     """List all admins (Superadmin only)"""
-    admins = User.objects.filter(role__name='admin').order_by('first_name')
-    return render(request, 'users/admin_list.html', {'admins': admins})
+    page = await apaginate(request, User.objects.filter(role_name='admin').values(
+        *USER_LIST_FIELDS
+    ).order_by('first_name', 'id'))
+    return await arender(request, 'users/admin_list.html', {'admins': page.object_list, 'page_obj': page})
 
 
 @login_required
@@ -125,9 +171,11 @@ def admin_create(request):
             try:
                 with transaction.atomic():
                     user = form.save()
-                    logger.info(f"Admin {user.username} created by {request.user.username}")
+                    logger.info("Admin %s created by %s", user.username, request.user.username)
                     messages.success(request, f'Admin {user.full_name} created successfully')
                     return redirect('admin_list')
+            except ValidationError as e:
+                form.add_error(None, e)
             except Exception as e:
                 messages.error(request, f'Error creating admin: {str(e)}')
     else:
@@ -138,10 +186,12 @@ def admin_create(request):
 
 @login_required
 @role_required(['admin'])
-def teacher_list(request):
+async def teacher_list(request):
     """List all teachers (Admin only)"""
-    teachers = User.objects.filter(role__name='teacher').order_by('first_name')
-    return render(request, 'users/teacher_list.html', {'teachers': teachers})
+    page = await apaginate(request, User.objects.filter(role_name='teacher').values(
+        *USER_LIST_FIELDS
+    ).order_by('first_name', 'id'))
+    return await arender(request, 'users/teacher_list.html', {'teachers': page.object_list, 'page_obj': page})
 
 
 @login_required
@@ -154,9 +204,11 @@ def teacher_create(request):
             try:
                 with transaction.atomic():
                     user = form.save()
-                    logger.info(f"Teacher {user.username} created by {request.user.username}")
+                    logger.info("Teacher %s created by %s", user.username, request.user.username)
                     messages.success(request, f'Teacher {user.full_name} created successfully')
                     return redirect('teacher_list')
+            except ValidationError as e:
+                form.add_error(None, e)
             except Exception as e:
                 messages.error(request, f'Error creating teacher: {str(e)}')
     else:
@@ -167,10 +219,12 @@ def teacher_create(request):
 
 @login_required
 @role_required(['admin'])
-def student_list(request):
+async def student_list(request):
     """List all students (Admin only)"""
-    students = User.objects.filter(role__name='student').order_by('first_name')
-    return render(request, 'users/student_list.html', {'students': students})
+    page = await apaginate(request, User.objects.filter(role_name='student').values(
+        *USER_LIST_FIELDS
+    ).order_by('first_name', 'id'))
+    return await arender(request, 'users/student_list.html', {'students': page.object_list, 'page_obj': page})
 
 
 @login_required
@@ -183,9 +237,11 @@ def student_create(request):
             try:
                 with transaction.atomic():
                     user = form.save()
-                    logger.info(f"Student {user.username} created by {request.user.username}")
+                    logger.info("Student %s created by %s", user.username, request.user.username)
                     messages.success(request, f'Student {user.full_name} created successfully')
                     return redirect('student_list')
+            except ValidationError as e:
+                form.add_error(None, e)
             except Exception as e:
                 messages.error(request, f'Error creating student: {str(e)}')
     else:
@@ -197,12 +253,15 @@ def student_create(request):
 # Course Management Views
 @login_required
 @role_required(['admin', 'superadmin'])
-def course_list(request):
+async def course_list(request):
     """List all courses"""
-    courses = Course.objects.filter(is_active=True).select_related(
+    page = await apaginate(request, Course.objects.filter(is_active=True).select_related(
         'level', 'room', 'shift', 'teacher'
-    ).order_by('name')
-    return render(request, 'courses/course_list.html', {'courses': courses})
+    ).only(
+        'id', 'name', 'level__level', 'room__number', 'shift__name',
+        'teacher__first_name', 'teacher__last_name', 'teacher__role_name'
+    ).order_by('name', 'id'))
+    return await arender(request, 'courses/course_list.html', {'courses': page.object_list, 'page_obj': page})
 
 
 @login_required
@@ -215,7 +274,7 @@ def course_create(request):
             try:
                 with transaction.atomic():
                     course = form.save()
-                    logger.info(f"Course '{course.name}' created by {request.user.username}")
+                    logger.info("Course '%s' created by %s", course.name, request.user.username)
                     messages.success(request, f'Course {course.name} created successfully')
                     return redirect('course_list')
             except Exception as e:
@@ -238,7 +297,7 @@ def course_edit(request, course_id):
             try:
                 with transaction.atomic():
                     course = form.save()
-                    logger.info(f"Course '{course.name}' updated by {request.user.username}")
+                    logger.info("Course '%s' updated by %s", course.name, request.user.username)
                     messages.success(request, f'Course {course.name} updated successfully')
                     return redirect('course_list')
             except Exception as e:
@@ -255,22 +314,28 @@ def course_edit(request, course_id):
 
 @login_required
 @role_required(['teacher'])
-def teacher_courses(request):
+async def teacher_courses(request):
     """List courses assigned to teacher"""
-    courses = Course.objects.filter(
-        teacher=request.user,
+    user = await request.auser()
+    courses = [course async for course in Course.objects.filter(
+        teacher=user,
         is_active=True
-    ).select_related('level', 'room', 'shift')
+    ).only('id', 'name')]
 
-    return render(request, 'courses/teacher_courses.html', {'courses': courses})
+    return await arender(request, 'courses/teacher_courses.html', {'courses': courses})
 
 
 @login_required
 @role_required(['teacher'])
 def course_students(request, course_id):
     """View students in a course (Teacher only - for their courses)"""
-    course = get_object_or_404(Course, id=course_id, teacher=request.user, is_active=True)
-    students = StudentDetail.objects.filter(course=course).select_related('user')
+    # Only the id and name are used downstream
+    course = get_object_or_404(
+        Course.objects.only('id', 'name'), id=course_id, teacher=request.user, is_active=True
+    )
+    students = StudentDetail.objects.filter(course=course).select_related('user').only(
+        'id', 'user__first_name', 'user__last_name', 'user__username'
+    )
 
     return render(request, 'courses/course_students.html', {
         'course': course,
@@ -283,7 +348,10 @@ def course_students(request, course_id):
 @role_required(['teacher'])
 def lesson_create(request, course_id):
     """Create lesson and mark attendance"""
-    course = get_object_or_404(Course, id=course_id, teacher=request.user, is_active=True)
+    # Only the id and name are used downstream
+    course = get_object_or_404(
+        Course.objects.only('id', 'name'), id=course_id, teacher=request.user, is_active=True
+    )
 
     if request.method == 'POST':
         form = LessonForm(request.POST)
@@ -295,9 +363,14 @@ def lesson_create(request, course_id):
                     lesson.save()
 
                     # No longer redirecting immediately to mark_attendance
-                    logger.info(f"Lesson '{lesson.topic}' created for course '{course.name}'")
+                    logger.info("Lesson '%s' created for course '%s'", lesson.topic, course.name)
                     messages.success(request, f'Lesson "{lesson.topic}" created successfully')
                     return redirect('teacher_courses') # Redirect to somewhere sensible.
+            except IntegrityError:
+                # One lesson per course per day is enforced by the unique constraint
+                form.add_error(
+                    'date', f"A lesson already exists for this course on {form.cleaned_data['date']}"
+                )
             except Exception as e:
                 messages.error(request, f'Error creating lesson: {str(e)}')
     else:
@@ -314,47 +387,48 @@ def lesson_create(request, course_id):
 @role_required(['teacher'])
 def mark_attendance(request, lesson_id):
     """Mark attendance for a lesson"""
-    lesson = get_object_or_404(Lesson, id=lesson_id, course__teacher=request.user)
-    students = StudentDetail.objects.filter(course=lesson.course).select_related('user')
+    lesson = get_object_or_404(
+        Lesson.objects.only('id', 'topic', 'course_id'), id=lesson_id, course__teacher=request.user
+    )
+    students = StudentDetail.objects.filter(course_id=lesson.course_id).select_related('user')
 
     if request.method == 'POST':
-        try:
-            with transaction.atomic():
-                for student_detail in students:
-                    status_id = request.POST.get(f'student_{student_detail.user.id}')
-                    if status_id:
-                        status = get_object_or_404(AttendanceStatus, id=status_id)
-
-                        attendance, created = Attendance.objects.get_or_create(
-                            lesson=lesson,
-                            student=student_detail.user,
-                            defaults={
-                                'status': status,
-                                'marked_by': request.user  # Assign the current user as marker
-                            }
+        form = AttendanceForm(request.POST, students=[student_detail.user for student_detail in students])
+        if form.is_valid():
+            try:
+                with transaction.atomic():
+                    existing = {
+                        student_id: (status_id, marked_by_id)
+                        for student_id, status_id, marked_by_id in lesson.attendances.values_list(
+                            'student_id', 'status_id', 'marked_by_id'
                         )
+                    }
+                    # Only new or changed rows need writing
+                    marked = {
+                        student_id: status_id
+                        for student_id, status_id in form.cleaned_data['payload'].items()
+                        if existing.get(student_id) != (status_id, request.user.id)
+                    }
 
-                        if not created:
-                            attendance.status = status
-                            attendance.marked_by = request.user # Ensure it's updated too!
-                            attendance.save()
+                    # One upsert for the whole class; the current user is the marker
+                    Attendance.bulk_upsert(lesson, marked, request.user)
 
-                messages.success(request, 'Attendance marked successfully')
-                logger.info(f"Attendance marked for lesson '{lesson.topic}' by {request.user.username}")
-                return redirect('teacher_courses')
+                    messages.success(request, 'Attendance marked successfully')
+                    logger.info("Attendance marked for lesson '%s' by %s", lesson.topic, request.user.username)
+                    return redirect('teacher_courses')
 
-        except Exception as e:
-            messages.error(request, f'Error marking attendance: {str(e)}')
+            except Exception as e:
+                messages.error(request, f'Error marking attendance: {str(e)}')
+    else:
+        form = AttendanceForm()
 
     # Get existing attendance records
-    existing_attendance = {
-        att.student.id: att.status.id
-        for att in lesson.attendances.all()
-    }
+    existing_attendance = dict(lesson.attendances.values_list('student_id', 'status_id'))
 
-    statuses = AttendanceStatus.objects.all()
+    statuses = AttendanceStatus.get_cached()
 
     return render(request, 'lessons/mark_attendance.html', {
+        'form': form,
         'lesson': lesson,
         'students': students,
         'statuses': statuses,
@@ -369,19 +443,27 @@ def student_attendance(request):
         messages.error(request, 'Access denied')
         return redirect('dashboard')
 
-    enrolled_courses = StudentDetail.objects.filter(user=request.user).select_related('course')
+    enrolled_courses = list(
+        StudentDetail.objects.filter(user=request.user).select_related('course')
+    )
+
+    # One query for every enrolled course, grouped by course in Python
+    records_by_course = defaultdict(list)
+    for record in Attendance.objects.filter(
+        student=request.user,
+        lesson__course_id__in=[enrollment.course_id for enrollment in enrolled_courses]
+    ).select_related('lesson', 'status').only(
+        'id', 'lesson__topic', 'lesson__date', 'lesson__course_id', 'status__name'
+    ):
+        records_by_course[record.lesson.course_id].append(record)
+
     attendance_data = []
 
     for enrollment in enrolled_courses:
-        course_attendance = Attendance.objects.filter(
-            student=request.user,
-            lesson__course=enrollment.course
-        ).select_related('lesson', 'status')
-
         attendance_data.append({
             'course': enrollment.course,
             'attendance_percentage': enrollment.attendance_percentage,
-            'attendance_records': course_attendance
+            'attendance_records': records_by_course[enrollment.course_id]
         })
 
     return render(request, 'attendance/student_attendance.html', {
@@ -402,14 +484,14 @@ def enroll_student(request):
                     student = form.cleaned_data['student']
                     courses = form.cleaned_data['courses']
 
-                    for course in courses:
-                        StudentDetail.objects.get_or_create(
-                            user=student,
-                            course=course
-                        )
+                    # One INSERT; the (user, course) unique constraint keeps it idempotent
+                    StudentDetail.objects.bulk_create(
+                        [StudentDetail(user=student, course=course) for course in courses],
+                        ignore_conflicts=True
+                    )
 
                     messages.success(request, f'Student {student.full_name} enrolled successfully')
-                    logger.info(f"Student {student.username} enrolled in courses by {request.user.username}")
+                    logger.info("Student %s enrolled in courses by %s", student.username, request.user.username)
                     return redirect('student_list')
             except Exception as e:
                 messages.error(request, f'Error enrolling student: {str(e)}')